@@ -0,0 +1,97 @@
+import glob
+import os
+import tempfile
+import unittest
+
+import teste
+
+PASTA_EXEMPLOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "api", "cnab-examples")
+
+
+class TestExtracaoParalela(unittest.TestCase):
+    """
+    A extração em trechos (e a gravação em paralelo) deve produzir
+    exatamente o mesmo resultado da extração serial
+    """
+
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(self.pasta.cleanup)
+
+        # Todos os arquivos de exemplo concatenados: pagamentos de boleto
+        # (J, J-52, B) e de PIX (A, B) em sequência
+        conteudo = b""
+        for exemplo in sorted(glob.glob(os.path.join(PASTA_EXEMPLOS, "*.txt"))):
+            with open(exemplo, "rb") as arquivo:
+                conteudo += arquivo.read()
+        self.arquivo_cnab = self._criar_arquivo("exemplos.txt", conteudo)
+
+    def _criar_arquivo(self, nome, conteudo):
+        caminho = os.path.join(self.pasta.name, nome)
+        with open(caminho, "wb") as arquivo:
+            arquivo.write(conteudo)
+        return caminho
+
+    def _ler(self, caminho):
+        with open(caminho, encoding="utf-8") as arquivo:
+            return arquivo.read()
+
+    def test_trechos_cobrem_o_arquivo_em_inicios_de_linha(self):
+        with open(self.arquivo_cnab, "rb") as arquivo:
+            conteudo = arquivo.read()
+
+        for tamanho_trecho in (1, 500, 5000, len(conteudo)):
+            trechos = teste._dividir_em_trechos(self.arquivo_cnab, tamanho_trecho)
+            self.assertEqual(trechos[0][0], 0)
+            self.assertEqual(trechos[-1][1], len(conteudo))
+            for (_inicio, fim), (proximo_inicio, _fim) in zip(trechos, trechos[1:]):
+                self.assertEqual(fim, proximo_inicio)
+                # O corte cai no início de uma linha que não segue um Segmento J
+                self.assertEqual(conteudo[fim - 1:fim], b"\n")
+                linha_anterior = conteudo[conteudo.rfind(b"\n", 0, fim - 1) + 1:fim]
+                self.assertNotEqual(linha_anterior[7:14:6], b"3J")
+
+    def test_trechos_de_arquivo_vazio(self):
+        arquivo_vazio = self._criar_arquivo("vazio.txt", b"")
+        self.assertEqual(teste._dividir_em_trechos(arquivo_vazio, 500), [])
+
+    def test_extracao_por_trechos_igual_a_serial(self):
+        serial = teste.extrair_pagamentos_cnab240(self.arquivo_cnab)
+        self.assertTrue(serial)
+
+        for tamanho_trecho in (1, 500, 5000):
+            por_trechos = [
+                pagamento
+                for inicio, fim in teste._dividir_em_trechos(self.arquivo_cnab, tamanho_trecho)
+                for pagamento in teste.iterar_pagamentos_cnab240(self.arquivo_cnab, inicio, fim)
+            ]
+            self.assertEqual(por_trechos, serial)
+
+    def test_salvar_paralelo_igual_ao_serial(self):
+        pagamentos = teste.extrair_pagamentos_cnab240(self.arquivo_cnab)
+
+        for indentado in (False, True):
+            serial = teste.salvar_resultados(
+                pagamentos, self.pasta.name, timestamp="serial", indentado=indentado
+            )
+            paralelo = teste.salvar_resultados_paralelo(
+                self.arquivo_cnab, self.pasta.name, timestamp="paralelo",
+                indentado=indentado, processos=2, tamanho_trecho=5000
+            )
+            self.assertEqual(self._ler(paralelo), self._ler(serial))
+
+    def test_salvar_paralelo_sem_pagamentos(self):
+        # Apenas registros que não são J: todos os trechos vêm vazios
+        with open(self.arquivo_cnab, "rb") as arquivo:
+            linhas = [linha for linha in arquivo if linha[7:14:6] != b"3J"]
+        sem_pagamentos = self._criar_arquivo("sem_pagamentos.txt", b"".join(linhas))
+
+        arquivo_json = teste.salvar_resultados_paralelo(
+            sem_pagamentos, self.pasta.name, timestamp="vazio",
+            processos=2, tamanho_trecho=5000
+        )
+        self.assertEqual(self._ler(arquivo_json), "[]")
+
+
+if __name__ == "__main__":
+    unittest.main()
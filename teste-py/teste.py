@@ -1,162 +1,446 @@
+import functools
 import json
+import mmap
+import operator
 import os
+import re
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+# Codificações dos registros CNAB. Os arquivos são ASCII, com eventuais
+# acentos em UTF-8 ou em Latin-1; um registro que não é UTF-8 válido é
+# decodificado como latin-1 (cópia direta byte -> caractere, que nunca falha)
+CODIFICACAO_CNAB = 'utf-8'
+CODIFICACAO_CNAB_ALTERNATIVA = 'latin-1'
+
+# Tipo de registro (posição 8) + segmento (posição 14), lidos juntos com o
+# fatiamento estendido registro[7:14:6] - um único slice e uma comparação
+_POSICOES_TIPO_SEGMENTO = slice(7, 14, 6)
+_SEGMENTO_J = b"3J"
+_SEGMENTO_B = b"3B"
+
+# Email no final do Segmento B: primeira palavra (delimitada por brancos)
+# com "@" e "." e mais de 5 caracteres
+_REGEX_EMAIL = re.compile(r"(?<!\S)(?=\S*@)(?=\S*\.)\S{6,}")
+
+# Tamanho aproximado (em bytes) do trecho do arquivo entregue a cada processo
+# na extração em paralelo (8 MiB, cerca de 35 mil registros)
+TAMANHO_TRECHO_PARALELO = 8 << 20
+
+# Codificadores JSON reutilizados na gravação dos resultados. Sem
+# indentação o json usa o codificador em C (c_make_encoder); com indent=2
+# cai no codificador em Python
+_CODIFICADOR_JSON_COMPACTO = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+_CODIFICADOR_JSON_INDENTADO = json.JSONEncoder(ensure_ascii=False, indent=2)
+
+def _compilar_layout(layout):
+    """
+    Converte um layout posicional (campo, início, fim) em um
+    operator.itemgetter de fatias, de modo que todos os campos sejam
+    fatiados por uma única chamada em C. Os nomes documentam a ordem em que
+    _decodificar_campos devolve os valores
+    """
+    return operator.itemgetter(*(slice(inicio, fim) for _campo, inicio, fim in layout))
+
+# Layouts posicionais (campo, início, fim) dos segmentos CNAB240.
+# As posições são em caracteres, contadas a partir de zero.
+_LAYOUT_SEGMENTO_J = _compilar_layout((
+    ("codigo_banco", 0, 3),
+    ("codigo_lote", 3, 7),
+    ("tipo_registro", 7, 8),
+    ("numero_registro", 8, 13),
+    ("segmento", 13, 14),
+    ("codigo_barras", 17, 61),
+    ("favorecido_nome", 61, 91),
+    ("data_pagamento", 91, 99),
+    ("descontos", 114, 129),
+    ("acrescimos", 129, 144),
+    ("informacoes", 200, 220),
+    # Campos que se sobrepõem ao código de barras (posições 14-61)
+    ("codigo_movimento", 14, 20),
+    ("banco_favorecido", 20, 23),
+    ("codigo_camara", 23, 26),
+    ("valor", 26, 36),
+    ("documento", 41, 61),
+))
+
+# Segunda linha J (J-52) - dados do pagador
+_LAYOUT_SEGMENTO_J_PAGADOR = _compilar_layout((
+    ("cnpj_pagador", 21, 35),
+    ("pagador_nome", 35, 58),
+))
+
+_LAYOUT_SEGMENTO_B = _compilar_layout((
+    ("cnpj_favorecido", 18, 32),
+    ("logradouro", 32, 62),
+    ("numero_endereco", 62, 67),
+    ("complemento", 67, 82),
+    ("bairro", 82, 97),
+    ("cidade", 97, 117),
+    ("cep", 117, 125),
+    ("uf", 125, 127),
+))
+
+def _decodificar_campos(registro, layout):
+    """
+    Extrai os campos de um registro (já decodificado) de largura fixa
+    conforme o layout compilado; os campos são fatiados de uma vez só e os
+    valores são devolvidos na ordem do layout
+    """
+    # Campos alfanuméricos do CNAB são alinhados à esquerda e completados com
+    # brancos à direita; só o final precisa ser limpo. Um registro truncado
+    # resulta em campos vazios, como no fatiamento
+    return [valor.rstrip() for valor in layout(registro)]
+
+def _decodificar_registro(dados):
+    """
+    Decodifica um registro inteiro. As posições do layout são contadas em
+    caracteres, e um acento em UTF-8 ocupa dois bytes: o registro precisa ser
+    decodificado antes de ser fatiado
+    """
+    try:
+        return dados.decode(CODIFICACAO_CNAB)
+    except UnicodeDecodeError:
+        return dados.decode(CODIFICACAO_CNAB_ALTERNATIVA)
+
+def _quebra_somente_retorno(mm):
+    """
+    Indica se as linhas do arquivo terminam só em \r (sem \n). A quebra de
+    linha é detectada uma vez, pela primeira linha: arquivos em \n ou \r\n
+    são lidos com mmap.readline, e um \r solto no meio deles não é tratado
+    como quebra de linha
+    """
+    fim_primeira_linha = mm.find(b"\n")
+    if fim_primeira_linha == -1:
+        fim_primeira_linha = len(mm)
+    retorno = mm.find(b"\r", 0, fim_primeira_linha)
+    return retorno != -1 and retorno < fim_primeira_linha - 1
+
+def _iterar_detalhes(caminho_arquivo, inicio_trecho=0, fim_trecho=None):
+    """
+    Percorre os registros de detalhe J e B do arquivo CNAB mapeado em memória
+    (mmap), lendo as linhas com mmap.readline (busca da quebra de linha em C).
+    Gera (tipo + segmento, início, fim após a quebra de linha, bytes do
+    registro com a quebra de linha). Opcionalmente se restringe aos registros
+    que começam no trecho [inicio_trecho, fim_trecho) do arquivo
+    """
+    with open(caminho_arquivo, 'rb') as arquivo:
+        # mmap não aceita mapear arquivos vazios
+        if os.fstat(arquivo.fileno()).st_size == 0:
+            return
+
+        with mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if fim_trecho is None:
+                fim_trecho = len(mm)
+            mm.seek(inicio_trecho)
+            ler_linha = mm.readline
+            if _quebra_somente_retorno(mm):
+                # O readline do mmap só separa em \n; arquivos com quebras
+                # só em \r são separados como no modo texto do Python
+                ler_linha = iter(mm[inicio_trecho:fim_trecho].splitlines(keepends=True)).__next__
+            fim = inicio_trecho
+            while fim < fim_trecho:
+                linha = ler_linha()
+                inicio = fim
+                fim += len(linha)
+                segmento = linha[_POSICOES_TIPO_SEGMENTO]
+                if segmento == _SEGMENTO_J or segmento == _SEGMENTO_B:
+                    yield segmento, inicio, fim, linha
+
+def _campos_segmento_b(registro):
+    """
+    Segmento B - extrai os dados complementares (endereço, email, etc.)
+    """
+    (cnpj_favorecido, logradouro, numero_endereco, complemento, bairro,
+     cidade, cep, uf) = _decodificar_campos(registro, _LAYOUT_SEGMENTO_B)
+
+    # Tentar extrair email do final da linha (a partir da posição
+    # 128). O find() descarta em C as linhas sem "@"
+    email = ""
+    if registro.find("@", 127) != -1:
+        resto_linha = registro[127:]
+        encontrado = _REGEX_EMAIL.search(resto_linha)
+        if encontrado is not None:
+            email = encontrado.group()
+
+    # Montar o endereço a partir dos campos já sem brancos (cada
+    # campo é limpo uma única vez). O replace("  ", " ") continua
+    # necessário: os campos trazem espaços duplos internos
+    # (ex.: "SALA  90") que o endereço sempre normalizou
+    endereco_completo = f"{logradouro}, {numero_endereco} {complemento} - {bairro} - {cidade}/{uf} - CEP: {cep}".replace("  ", " ").strip()
+
+    return {
+        "endereco_completo": endereco_completo,
+        "logradouro": logradouro,
+        "numero_endereco": numero_endereco,
+        "complemento": complemento,
+        "bairro": bairro,
+        "cidade": cidade,
+        "cep": cep,
+        "uf": uf,
+        "email": email,
+        "cnpj_favorecido": cnpj_favorecido
+    }
+
+# Campos do Segmento B de um pagamento sem esse segmento
+_SEGMENTO_B_AUSENTE = dict.fromkeys((
+    "endereco_completo", "logradouro", "numero_endereco", "complemento",
+    "bairro", "cidade", "cep", "uf", "email", "cnpj_favorecido"
+), "")
+
+def _montar_pagamento(registro_j, registro_pagador, registro_b):
+    """
+    Cria o pagamento, em um único dicionário, a partir da primeira linha J
+    (dados de valor/documento) e, quando existirem, da segunda linha J
+    (dados do pagador) e do Segmento B
+    """
+    (codigo_banco, codigo_lote, tipo_registro, numero_registro, segmento,
+     codigo_barras, favorecido_nome, data_pagamento, descontos, acrescimos,
+     informacoes, codigo_movimento, banco_favorecido, codigo_camara, valor_str,
+     documento) = _decodificar_campos(registro_j, _LAYOUT_SEGMENTO_J)
+
+    # Tratamento seguro para conversão de valores. No caso comum o
+    # campo já vem só com dígitos (zeros à esquerda) e vai direto
+    # para int(); a filtragem caractere a caractere fica para
+    # valores com brancos ou outros caracteres
+    if valor_str.isdecimal():
+        valor_reais = int(valor_str) / 100
+    else:
+        try:
+            valor_pagamento_limpo = ''.join(filter(str.isdigit, valor_str))
+            if valor_pagamento_limpo:
+                valor_reais = int(valor_pagamento_limpo) / 100
+            else:
+                valor_reais = 0.0
+        except (ValueError, TypeError):
+            valor_reais = 0.0
+
+    # Segunda linha J - dados do pagador
+    if registro_pagador is not None:
+        cnpj_pagador, pagador_nome = _decodificar_campos(registro_pagador, _LAYOUT_SEGMENTO_J_PAGADOR)
+    else:
+        cnpj_pagador = pagador_nome = ""
+
+    # Segmento B - dados complementares
+    if registro_b is not None:
+        campos_b = _campos_segmento_b(registro_b)
+    else:
+        campos_b = _SEGMENTO_B_AUSENTE
+
+    return {
+        "favorecido_nome": favorecido_nome,
+        "pagador_nome": pagador_nome,
+        "cnpj_pagador": cnpj_pagador,
+        "banco_favorecido": banco_favorecido,
+        "valor": valor_reais,
+        "data_pagamento": data_pagamento,
+        "documento": documento,
+        "codigo_banco": codigo_banco,
+        "codigo_lote": codigo_lote,
+        "tipo_registro": tipo_registro,
+        "numero_registro": numero_registro,
+        "segmento": segmento,
+        "codigo_movimento": codigo_movimento,
+        "codigo_camara": codigo_camara,
+        "informacoes": informacoes,
+        "descontos": descontos,
+        "acrescimos": acrescimos,
+        "codigo_barras": codigo_barras,
+        **campos_b
+    }
+
+# Registros que complementam o pagamento em aberto, conforme a etapa em que
+# ele está e o segmento do registro seguinte:
+# (etapa, segmento) -> (nova etapa, posição do registro em _montar_pagamento)
+_COMPLEMENTOS = {
+    ("J", _SEGMENTO_J): ("J-52", 1),
+    ("J", _SEGMENTO_B): ("B", 2),
+    ("J-52", _SEGMENTO_B): ("B", 2),
+}
+
+def iterar_pagamentos_cnab240(caminho_arquivo, inicio_trecho=0, fim_trecho=None):
+    """
+    Gera os pagamentos do arquivo CNAB240 um a um, sem acumulá-los em memória.
+    inicio_trecho/fim_trecho restringem a leitura a um trecho do arquivo
+    (usado pela extração em paralelo)
+    """
+    # Registros (J, J-52, B), já decodificados, do pagamento em aberto; o
+    # dicionário do pagamento só é montado quando ele se encerra
+    registros = None
+    etapa = None
+    fim_anterior = -1
+
+    # Apenas os registros J e B são percorridos, e apenas os registros que
+    # entram em um pagamento são decodificados
+    for segmento, inicio, fim, dados in _iterar_detalhes(caminho_arquivo, inicio_trecho, fim_trecho):
+        # Um registro só complementa o pagamento em aberto se estiver na linha
+        # seguinte (seu início coincide com o fim do registro anterior)
+        complemento = None
+        if inicio == fim_anterior:
+            complemento = _COMPLEMENTOS.get((etapa, segmento))
+
+        if complemento is not None:
+            etapa, posicao = complemento
+            registros[posicao] = _decodificar_registro(dados)
+        else:
+            if registros is not None:
+                yield _montar_pagamento(*registros)
+            registros = etapa = None
+
+            # Primeira linha J - inicia um novo pagamento (apenas registros
+            # completos, com as 240 posições). Como na leitura em modo texto,
+            # a quebra de linha (\r\n, \n ou \r) conta como uma posição
+            if segmento == _SEGMENTO_J:
+                registro_j = _decodificar_registro(dados)
+                if len(registro_j) - registro_j.endswith("\r\n") >= 240:
+                    registros = [registro_j, None, None]
+                    etapa = "J"
+
+        fim_anterior = fim
+
+    if registros is not None:
+        yield _montar_pagamento(*registros)
+
 def extrair_pagamentos_cnab240(caminho_arquivo):
-    pagamentos = []
-
-    with open(caminho_arquivo, 'r', encoding='utf-8') as arquivo:
-        linhas = arquivo.readlines()
-
-    i = 0
-    while i < len(linhas):
-        linha = linhas[i]
-
-        # Verifica se é um Segmento J (dados principais do boleto)
-        if linha[7:8] == "3" and linha[13:14] == "J":
-            # Primeira linha J - dados do pagamento
-            if len(linha) >= 240:
-                # Extrair dados da primeira linha J (dados de valor)
-                codigo_banco = linha[0:3].strip()
-                codigo_lote = linha[3:7].strip()
-                tipo_registro = linha[7:8].strip()
-                numero_registro = linha[8:13].strip()
-                segmento = linha[13:14].strip()
-                codigo_barras = linha[17:61].strip()
-                
-                # Campos específicos desta linha (dados de valor/documento)
-                codigo_movimento = linha[14:20].strip()
-                codigo_banco_favorecido = linha[20:23].strip()
-                codigo_camara = linha[23:26].strip()
-                valor_str = linha[26:36].strip()
-                documento = linha[41:61].strip()
-                nome_favorecido = linha[61:91].strip()
-                data_pagamento = linha[91:99].strip()
-                valor_pagamento_str = linha[110:125].strip()
-                descontos = linha[114:129].strip()
-                acrescimos = linha[129:143].strip()
-                informacoes = linha[200:220].strip()
-
-                # Tratamento seguro para conversão de valores
-                try:
-                    valor_pagamento_limpo = ''.join(filter(str.isdigit, valor_str))
-                    if valor_pagamento_limpo:
-                        valor_reais = int(valor_pagamento_limpo) / 100
-                    else:
-                        valor_reais = 0.0
-                except (ValueError, TypeError):
-                    valor_reais = 0.0
-
-                # Verificar se existe segunda linha J (dados do pagador)
-                pagador_nome = ""
-                cnpj_pagador = ""
-                if i + 1 < len(linhas):
-                    segunda_linha_j = linhas[i + 1]
-                    if segunda_linha_j[7:8] == "3" and segunda_linha_j[13:14] == "J":
-                        # Segunda linha J - dados do pagador
-                        cnpj_pagador = segunda_linha_j[21:35].strip()
-                        pagador_nome = segunda_linha_j[35:58].strip()
-                        
-                        i += 1  # Pular a segunda linha J
-
-                # Criar objeto base do pagamento
-                pagamento = {
-                    "favorecido_nome": nome_favorecido.strip(),
-                    "pagador_nome": pagador_nome.strip(),
-                    "cnpj_pagador": cnpj_pagador,
-                    "banco_favorecido": codigo_banco_favorecido,
-                    "valor": valor_reais,
-                    "data_pagamento": data_pagamento,
-                    "documento": documento.strip(),
-                    "codigo_banco": codigo_banco,
-                    "codigo_lote": codigo_lote,
-                    "tipo_registro": tipo_registro,
-                    "numero_registro": numero_registro,
-                    "segmento": segmento,
-                    "codigo_movimento": codigo_movimento,
-                    "codigo_camara": codigo_camara,
-                    "informacoes": informacoes,
-                    "descontos": descontos,
-                    "acrescimos": acrescimos,
-                    "codigo_barras": codigo_barras,
-                    # Campos do Segmento B (serão preenchidos se existir)
-                    "endereco_completo": "",
-                    "logradouro": "",
-                    "numero_endereco": "",
-                    "complemento": "",
-                    "bairro": "",
-                    "cidade": "",
-                    "cep": "",
-                    "uf": "",
-                    "email": "",
-                    "cnpj_favorecido": ""
-                }
-
-                # Verificar se a próxima linha é um Segmento B (dados complementares)
-                if i + 1 < len(linhas):
-                    proxima_linha = linhas[i + 1]
-                    if proxima_linha[7:8] == "3" and proxima_linha[13:14] == "B":
-                        # Segmento B - Extrair dados complementares (endereço, email, etc.)
-                        cnpj_favorecido = proxima_linha[18:32].strip()
-                        logradouro = proxima_linha[32:62].strip()
-                        numero_endereco = proxima_linha[62:67].strip()
-                        complemento = proxima_linha[67:82].strip()
-                        bairro = proxima_linha[82:97].strip()
-                        cidade = proxima_linha[97:117].strip()
-                        cep = proxima_linha[117:125].strip()
-                        uf = proxima_linha[125:127].strip()
-                        
-                        # Tentar extrair email do final da linha
-                        resto_linha = proxima_linha[127:].strip()
-                        email = ""
-                        if "@" in resto_linha:
-                            # Procurar por padrão de email
-                            partes = resto_linha.split()
-                            for parte in partes:
-                                if "@" in parte and "." in parte and len(parte) > 5:
-                                    email = parte.strip()
-                                    break
-                        
-                        # Adicionar dados do Segmento B ao pagamento
-                        pagamento.update({
-                            "cnpj_favorecido": cnpj_favorecido,
-                            "endereco_completo": f"{logradouro.strip()}, {numero_endereco.strip()} {complemento.strip()} - {bairro.strip()} - {cidade.strip()}/{uf} - CEP: {cep.strip()}".replace("  ", " ").strip(),
-                            "logradouro": logradouro.strip(),
-                            "numero_endereco": numero_endereco.strip(),
-                            "complemento": complemento.strip(),
-                            "bairro": bairro.strip(),
-                            "cidade": cidade.strip(),
-                            "cep": cep.strip(),
-                            "uf": uf.strip(),
-                            "email": email
-                        })
-                        
-                        # Pular a linha do Segmento B na próxima iteração
-                        i += 1
-
-                pagamentos.append(pagamento)
-                
-        i += 1
-
-    return pagamentos
-
-def salvar_resultados(pagamentos, pasta_destino="results"):
-    """
-    Salva os dados extraídos em diferentes formatos na pasta especificada
+    """
+    Extrai todos os pagamentos do arquivo CNAB240 em uma lista
+    """
+    return list(iterar_pagamentos_cnab240(caminho_arquivo))
+
+def _dividir_em_trechos(caminho_arquivo, tamanho_trecho):
+    """
+    Divide o arquivo em trechos [início, fim) de aproximadamente
+    tamanho_trecho bytes. Cada corte cai no início de uma linha e nunca logo
+    após um Segmento J, já que a linha seguinte (J-52 ou B) pode pertencer
+    ao mesmo pagamento
+    """
+    with open(caminho_arquivo, 'rb') as arquivo:
+        tamanho = os.fstat(arquivo.fileno()).st_size
+        if tamanho == 0:
+            return []
+
+        cortes = [0]
+        with mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            alvo = tamanho_trecho
+            while alvo < tamanho:
+                # Início da primeira linha a partir do alvo
+                corte = mm.find(b"\n", alvo - 1) + 1
+                while corte:
+                    inicio_anterior = mm.rfind(b"\n", 0, corte - 1) + 1
+                    if mm[inicio_anterior:corte][_POSICOES_TIPO_SEGMENTO] != _SEGMENTO_J:
+                        break
+                    corte = mm.find(b"\n", corte) + 1
+
+                if corte == 0 or corte >= tamanho:
+                    break
+                cortes.append(corte)
+                alvo = corte + tamanho_trecho
+
+        cortes.append(tamanho)
+        return list(zip(cortes, cortes[1:]))
+
+def _formato_json(indentado):
+    """
+    Devolve o enquadramento da lista JSON (abertura, separador, fechamento) e
+    a função que serializa um pagamento, no formato compacto ou indentado
+    """
+    if indentado:
+        # Cada registro indentado é deslocado um nível para ficar idêntico a
+        # json.dumps(pagamentos, indent=2): as quebras de linha só aparecem
+        # na estrutura (dentro de strings viram "\\n")
+        def serializar(pagamento):
+            return _CODIFICADOR_JSON_INDENTADO.encode(pagamento).replace("\n", "\n  ")
+        return "[\n  ", ",\n  ", "\n]", serializar
+    return "[", ",", "]", _CODIFICADOR_JSON_COMPACTO.encode
+
+def _arquivo_json_resultados(pasta_destino, timestamp):
+    """
+    Cria a pasta de destino, se preciso, e devolve o caminho do JSON de
+    resultados nomeado pelo timestamp (o horário atual, se não informado)
     """
     # Criar pasta results se não existir
     os.makedirs(pasta_destino, exist_ok=True)
     
     # Timestamp para nomear os arquivos
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    if timestamp is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
+    return os.path.join(pasta_destino, f"pagamentos_cnab240_{timestamp}.json")
+
+def salvar_resultados(pagamentos, pasta_destino="results", timestamp=None, indentado=False):
+    """
+    Salva os dados extraídos em diferentes formatos na pasta especificada.
+    Aceita qualquer iterável de pagamentos (inclusive o gerador de
+    iterar_pagamentos_cnab240), gravando um registro por vez.
+    O timestamp que nomeia os arquivos deve ser informado por quem chama;
+    sem ele, usa-se o horário atual. Por padrão o JSON é compacto, gerado
+    pelo codificador em C do módulo json; indentado=True produz a saída
+    legível (indent=2)
+    """
     # Salvar em JSON
-    arquivo_json = os.path.join(pasta_destino, f"pagamentos_cnab240_{timestamp}.json")
+    arquivo_json = _arquivo_json_resultados(pasta_destino, timestamp)
+    abertura, separador, fechamento, serializar = _formato_json(indentado)
+
+    # Cada pagamento é serializado e gravado isoladamente, com o enquadramento
+    # da lista escrito à mão
     with open(arquivo_json, 'w', encoding='utf-8') as f:
-        json.dump(pagamentos, f, indent=2, ensure_ascii=False)
+        vazio = True
+        for pagamento in pagamentos:
+            f.write(abertura if vazio else separador)
+            f.write(serializar(pagamento))
+            vazio = False
+        f.write("[]" if vazio else fechamento)
     
     return arquivo_json
 
+def _serializar_trecho(argumentos):
+    """
+    Extrai os pagamentos de um trecho do arquivo e devolve sua parte da lista
+    JSON já serializada (executado em outro processo). Uma única string
+    volta ao processo principal, em vez de um dicionário por pagamento a ser
+    serializado e desserializado pelo pickle
+    """
+    caminho_arquivo, inicio_trecho, fim_trecho, indentado = argumentos
+    _abertura, separador, _fechamento, serializar = _formato_json(indentado)
+    pagamentos = iterar_pagamentos_cnab240(caminho_arquivo, inicio_trecho, fim_trecho)
+    return separador.join(map(serializar, pagamentos))
+
+def salvar_resultados_paralelo(caminho_arquivo, pasta_destino="results", timestamp=None,
+                               indentado=False, processos=None,
+                               tamanho_trecho=TAMANHO_TRECHO_PARALELO):
+    """
+    Extrai os pagamentos e salva o JSON dividindo o arquivo CNAB240 em
+    trechos processados em paralelo por um ProcessPoolExecutor (o GIL impede
+    ganho com threads). Cada processo devolve seu trecho já serializado e o
+    arquivo gerado é idêntico ao de salvar_resultados. Arquivos menores que
+    um trecho são processados no próprio processo
+    """
+    trechos = _dividir_em_trechos(caminho_arquivo, tamanho_trecho)
+    if len(trechos) <= 1:
+        return salvar_resultados(iterar_pagamentos_cnab240(caminho_arquivo),
+                                 pasta_destino, timestamp, indentado)
+
+    arquivo_json = _arquivo_json_resultados(pasta_destino, timestamp)
+    abertura, separador, fechamento, _serializar = _formato_json(indentado)
+
+    with ProcessPoolExecutor(max_workers=processos) as executor, \
+            open(arquivo_json, 'w', encoding='utf-8') as f:
+        partes = executor.map(
+            _serializar_trecho,
+            [(caminho_arquivo, inicio, fim, indentado) for inicio, fim in trechos]
+        )
+        # As partes chegam na ordem dos trechos; trechos sem pagamentos
+        # não recebem separador
+        vazio = True
+        for parte in partes:
+            if parte:
+                f.write(abertura if vazio else separador)
+                f.write(parte)
+                vazio = False
+        f.write("[]" if vazio else fechamento)
+
+    return arquivo_json
+
 def calcular_total_pagamentos(pagamentos):
     """
     Calcula o valor total de todos os pagamentos
@@ -164,11 +448,16 @@ def calcular_total_pagamentos(pagamentos):
     total = sum(pagamento['valor'] for pagamento in pagamentos)
     return total
 
+# Troca os separadores do formato americano (1,234.56) pelos do brasileiro
+# (1.234,56) em uma única passada
+_SEPARADORES_BRL = str.maketrans(",.", ".,")
+
+@functools.lru_cache(maxsize=4096)
 def formatar_valor_brl(valor):
     """
     Formata valor para o padrão brasileiro (BRL)
     """
-    return f"R$ {valor:,.2f}".replace(',', 'X').replace('.', ',').replace('X', '.')
+    return f"R$ {valor:,.2f}".translate(_SEPARADORES_BRL)
 
 def main():
     """
@@ -189,7 +478,8 @@ def main():
         print(f"✅ Extração concluída: {len(pagamentos)} pagamentos encontrados")
         
         # Salvar resultados
-        arquivo_json = salvar_resultados(pagamentos)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        arquivo_json = salvar_resultados(pagamentos, timestamp=timestamp)
         
         print("✅ Arquivos salvos com sucesso:")
         print(f"   📄 JSON: {arquivo_json}")